@@ -1,10 +1,20 @@
 # %%
-import copy
-import fitz  # PyMuPDF
-from fitz import Document
+from __future__ import annotations
+import os
+import re
+import sys
+import mmap
+import numbers
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 
+# PyMuPDF (fitz) は読み込みに時間がかかるため、各関数の中で必要になった時点で import する
+# (--help などで MuPDF の初期化を待たずに済む。2回目以降の import はキャッシュされる)
+if TYPE_CHECKING:
+    from fitz import Document
+
 # モジュール概要:
 # このモジュールは PyMuPDF (fitz) を使った簡単なPDF操作ユーティリティを提供します。
 # 主な機能:
@@ -14,31 +24,84 @@ import argparse
 #  - ページ単位での分割、指定ページ数ごとの分割
 # CLI も提供しているため、コマンドラインから各機能を実行できます。
 
+# 出力PDF (2in1, ページ削除, マージ) の保存オプション
+# 重複オブジェクトの統合 (garbage=3 以上) や clean はページ数に対して線形以上に遅くなるため、
+# 未使用オブジェクトの除去と xref の詰め直し (garbage=2) と圧縮 (deflate) に留める
+_SAVE_OPTIONS = dict(garbage=2, deflate=True)
+
 # %%
-def check_pdf_args(pdf: Document | None = None, pdf_path: str | Path | None = None) -> Document:
+def _open_pdf(src: str | Path | bytes) -> Document:
     """
-    PDFオブジェクトまたはPDFパスから、PDFオブジェクトを取得する
+    PDFファイルのパスまたはPDFのバイト列からPDFオブジェクトを開く
+
+    パスが指定された場合はファイルを読み取り専用でメモリマップし、コピーせずにストリームとして開く
+    (返される Document が Document.stream としてマップへの参照を保持する。
+    Document.close() ではマップは解放されず、Document は PyMuPDF 内部で循環参照されるため
+    参照を消しても即座には解放されない。ファイルを解放するには _close_pdf で閉じること)
+
+    args:
+        src: PDFファイルのパス、またはPDFのバイト列
+
+    return:
+        PDFオブジェクト
+    """
+    import fitz  # PyMuPDF
+    if isinstance(src, (bytes, bytearray)):
+        return fitz.open(stream=src, filetype="pdf")  # メモリ上のPDFを開く
+    with open(src, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 空ファイルはメモリマップできないため、通常どおり開いて PyMuPDF のエラーに任せる
+            return fitz.open(src)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return fitz.open(stream=memoryview(mm), filetype="pdf")
+
+
+def _close_pdf(doc: Document) -> None:
+    """
+    PDFオブジェクトを閉じ、_open_pdf で作成したメモリマップも解放する
+
+    Document.close() は Document.stream を残すため、ここで参照を外してマップを即座に解放する
+    (循環参照のガベージコレクトを待たずに、元ファイルの上書きや置き換えができるようにする)
+
+    args:
+        doc: 閉じるPDFオブジェクト
+    """
+    doc.close()
+    doc.stream = None
+
+
+def check_pdf_args(
+    pdf: Document | None = None,
+    pdf_path: str | Path | None = None,
+    pdf_bytes: bytes | None = None,
+) -> Document:
+    """
+    PDFオブジェクト、PDFパスまたはPDFのバイト列から、PDFオブジェクトを取得する
+    pdf_path のファイルはメモリマップして開くため、返された Document を _close_pdf で閉じるまでは
+    そのファイルに上書き保存してはいけない (close() だけではマップは解放されない)
     
     args:
         pdf: PDFオブジェクト
         pdf_path: PDFファイルのパス
+        pdf_bytes: PDFのバイト列
     
     return:
         PDFオブジェクト
     
     raises:
-        ValueError: pdf と pdf_path の両方が指定されているか、両方が None の場合
+        ValueError: pdf, pdf_path, pdf_bytes のうち1つだけが指定されていない場合
     """
     # 引数チェック:
-    # - pdf が None で pdf_path が指定されていればファイルを開く
-    # - pdf が与えられていて pdf_path が None ならそのまま使用
-    # - それ以外（両方 None や両方指定）はエラー
-    if (pdf is None) and (pdf_path is not None):
-        pdf = fitz.open(pdf_path)  # 元のPDFを開く
-    elif (pdf is not None) and (pdf_path is None):
-        pass
-    else:
-        raise ValueError("pdf or pdf_path must be specified")
+    # - pdf_path が指定されていればファイルを開く
+    # - pdf_bytes が指定されていればメモリ上のPDFとして開く (ディスクを読み直さない)
+    # - pdf が与えられていればそのまま使用
+    # - それ以外（すべて None や複数指定）はエラー
+    if sum(x is not None for x in (pdf, pdf_path, pdf_bytes)) != 1:
+        raise ValueError("one of pdf, pdf_path or pdf_bytes must be specified")
+    if pdf_path is not None:
+        pdf = _open_pdf(pdf_path)  # 元のPDFを開く
+    elif pdf_bytes is not None:
+        pdf = _open_pdf(pdf_bytes)
     return pdf
 
 
@@ -46,45 +109,65 @@ def merge_pdf_2in1(
     pdf: Document | None = None,
     pdf_path: str | Path | None = None,
     output_path: str | Path = 'out.pdf',
+    pdf_bytes: bytes | None = None,
 ) -> None:
     """
     PDFを2 in 1 レイアウト(2ページを1ページに横並び)に変換する
-    pdf, pdf_pathのどちらかは必須
+    pdf, pdf_path, pdf_bytesのどれか1つは必須
 
     args:
         pdf (fitz.Document, optional): 元のPDFオブジェクト
         pdf_path (str, optional): 元のPDFファイルのパス
         output_path (str): 変換後のPDFの保存先パス (デフォルト: 'out.pdf')
+        pdf_bytes (bytes, optional): 元のPDFのバイト列
     
     return:
         None: 変換後のPDFは指定パスに保存される
     """
 
-    pdf = check_pdf_args(pdf, pdf_path)
+    opened_here = pdf is None  # この関数で開いたPDFは保存前に閉じる
+    pdf = check_pdf_args(pdf, pdf_path, pdf_bytes)
     # 新しいPDFを作成し、元PDFのページを2ページずつ横に並べる
     # 幅は元ページ幅の2倍、高さは元ページの高さを使用
     # show_pdf_page の Rect は左上(0,0)基準で描画領域を指定する
+    import fitz  # PyMuPDF
+    n = len(pdf)
+    if n == 0:  # ページが無い場合は何もしない
+        if opened_here:
+            _close_pdf(pdf)
+        print(f'  Skipped: {output_path} (no pages)')
+        return
+    # ページサイズと描画領域はループ外で一度だけ求める
+    W = pdf[0].rect.width
+    H = pdf[0].rect.height
+    left = fitz.Rect(0, 0, W, H)  # 左側の描画領域
+    right = fitz.Rect(W, 0, W * 2, H)  # 右側の描画領域
     new_pdf = fitz.open()  # 新しいPDFを作成
-    for i in range(0, len(pdf), 2):  # ページを2つずつ処理
-        new_page = new_pdf.new_page(width=pdf[0].rect.width * 2, height=pdf[0].rect.height)  # 新しいページを作成
-        if i < len(pdf):  # 左側のページを描画
-            page1 = pdf[i]
-            new_page.show_pdf_page(fitz.Rect(0, 0, pdf[0].rect.width, pdf[0].rect.height), pdf, i)
-        if i + 1 < len(pdf):  # 右側のページを描画
-            page2 = pdf[i + 1]
-            new_page.show_pdf_page(fitz.Rect(pdf[0].rect.width, 0, pdf[0].rect.width * 2, pdf[0].rect.height), pdf, i + 1)
+    for i in range(0, n, 2):  # ページを2つずつ処理
+        new_page = new_pdf.new_page(width=W * 2, height=H)  # 新しいページを作成
+        # show_pdf_page のオプションは明示的に指定する
+        # (元PDFのリソースは同じ Document 内で共有され、ページごとに複製されない)
+        # 左側のページは range の範囲内なので常に描画する
+        new_page.show_pdf_page(left, pdf, i, keep_proportion=True, overlay=True, oc=0, rotate=0, clip=None)
+        if i + 1 < n:  # 右側のページを描画
+            new_page.show_pdf_page(right, pdf, i + 1, keep_proportion=True, overlay=True, oc=0, rotate=0, clip=None)
     # --- 
-    new_pdf.save(output_path)  # 新しいPDFを保存
+    # 元PDFの内容は new_pdf に取り込み済みなので、保存前に閉じてメモリマップを解放する
+    # (出力先が元ファイルと同じ場合でも上書きできるようにする)
+    if opened_here:
+        _close_pdf(pdf)
+    new_pdf.save(output_path, **_SAVE_OPTIONS)  # 新しいPDFを保存
     new_pdf.close()
-    print('  Saved: {}'.format(output_path))
+    print(f'  Saved: {output_path}')
 
 
 
 def del_pdf_pages(
     pdf: Document | None = None,
     pdf_path: str | Path | None = None,
-    del_pages: int | list[int] | None = None,
+    del_pages: int | Iterable[int] | None = None,
     output_path: str | Path = 'out.pdf',
+    pdf_bytes: bytes | None = None,
 ) -> None:
     """
     PDFから指定したページを削除する
@@ -92,147 +175,319 @@ def del_pdf_pages(
     args:
         pdf (fitz.Document, optional): PDFオブジェクト
         pdf_path (str, optional): PDFファイルのパス
-        del_pages (int or list): 削除するページ番号(1ベース)。整数または整数リストで指定
+        del_pages (int or list): 削除するページ番号(1ベース)。整数または整数のリスト・タプル等で指定
         output_path (str): 出力PDFの保存先パス (デフォルト: 'out.pdf')
+        pdf_bytes (bytes, optional): PDFのバイト列
     
     return:
         None: 指定パスに保存される
+    
+    raises:
+        TypeError: del_pages が整数でも整数のイテラブルでもない場合 (文字列・バイト列・bool も不可)
+        ValueError: output_path が pdf_path と同じファイルの場合
     """
-    doc = check_pdf_args(pdf, pdf_path)
     # del_pages は 1 ベースで指定する（ユーザが直感的に扱えるように）
-    # list を受け取った場合は降順で削除する（インデックスずれ防止）
-    if type(del_pages) == int:
-        doc.delete_page(del_pages-1)  # ページを削除
-    elif type(del_pages) == list:
-        del_pages.sort(reverse=True)
-        for p in del_pages:
-            doc.delete_page(p-1)
-    else:
-        print("Error: del_pages must be int or list")
-        return
+    # 整数は1要素のリストに正規化し、常に delete_pages でまとめて削除する（1回の呼び出しで処理）
+    # 呼び出し元のリストは変更せず (sort しない)、重複は set で取り除く
+    # (重複したページ番号で誤ったページが削除されるのを防ぐ)
+    # 削除順によるインデックスずれは delete_pages 内部で処理されるため昇順でよい
+    # 文字列もイテラブルだが、"12" を 1, 2 ページと解釈しないよう明示的に拒否する
+    # bool も Integral に含まれるが、True を 1 ページ目と解釈しないよう拒否する
+    if isinstance(del_pages, numbers.Integral) and not isinstance(del_pages, bool):
+        del_pages = [del_pages]
+    elif isinstance(del_pages, (str, bytes, bytearray)) or not hasattr(del_pages, "__iter__"):
+        raise TypeError("del_pages must be int or iterable of int")
+    del_pages = list(del_pages)
+    if not all(isinstance(p, numbers.Integral) and not isinstance(p, bool) for p in del_pages):
+        raise TypeError("del_pages must be int or iterable of int")
+    zero_based = sorted({int(p) - 1 for p in del_pages})
 
-    doc.save(output_path)
-    doc.close()
-    print('  Saved: {}'.format(output_path))
+    # 元PDF自体を保存するため、メモリマップした元ファイルへの上書きは不可
+    if (pdf_path is not None) and (Path(pdf_path).resolve() == Path(output_path).resolve()):
+        raise ValueError("output_path must be different from pdf_path")
+    doc = check_pdf_args(pdf, pdf_path, pdf_bytes)
+    doc.delete_pages(zero_based)
+
+    # 削除したページのオブジェクトは保存時に除去される (_SAVE_OPTIONS)
+    doc.save(output_path, **_SAVE_OPTIONS)
+    _close_pdf(doc)  # 元ファイルのメモリマップもここで解放する
+    print(f'  Saved: {output_path}')
 
 
 def merge_pdf(
     pdf: Document | None = None,
-    pdf_list: list[str | Path] | None = None,
+    pdf_list: list[str | Path | bytes] | None = None,
     output_path: str | Path = 'out.pdf',
+    pdf_bytes: bytes | None = None,
+    annots: bool = True,
 ) -> None:
     """
     複数のPDFを1つのPDFにマージする
     
     args:
         pdf (fitz.Document, optional): ベースとなるPDFオブジェクト。Noneの場合は新規作成
-        pdf_list (list): マージするPDFファイルのパスリスト
+        pdf_list (list): マージするPDFファイルのパス (またはPDFのバイト列) のリスト
         output_path (str): 出力PDFの保存先パス (デフォルト: 'out.pdf')
+        pdf_bytes (bytes, optional): ベースとなるPDFのバイト列。pdf と同時には指定できない
+        annots (bool): False の場合は注釈とフォームフィールドをコピーしない (デフォルト: True)
     
     return:
         None: マージ後のPDFは指定パスに保存される
     """
-    # pdf が指定されていればそのコピーをベースにマージ、なければ新規作成
-    # pdf_list の順序で順に挿入される
-    if pdf is None:
-        merged_pdf = fitz.open()
-    else:
-        merged_pdf = copy(pdf)
+    # pdf が指定されていればそのページを新規PDFに挿入してベースにする (元の pdf は変更しない)
+    # なければ新規作成
+    # pdf_list の順序で1ファイルずつ開いて挿入し、挿入後すぐに閉じる
+    # (PyMuPDF はマルチスレッドに対応していないため、読み込みもメインスレッドで順に行う)
+    # 各ファイルは全ページを1回の insert_pdf でまとめて挿入し、
+    # 不要なオブジェクトの整理は最後の save で1回だけ行う
+    # annots=False の場合は MuPDF の注釈・ウィジェットのコピー処理を省略する
+    import fitz  # PyMuPDF
+    merged_pdf = fitz.open()
+    if (pdf is not None) or (pdf_bytes is not None):
+        base_pdf = check_pdf_args(pdf=pdf, pdf_bytes=pdf_bytes)
+        merged_pdf.insert_pdf(base_pdf, from_page=0, to_page=-1, annots=annots, widgets=annots, show_progress=0)
+    # 入力ファイルのメモリマップは挿入ごとに _close_pdf で解放する
+    # (出力先が入力ファイルの1つと同じ場合でも、保存時にマップが残らないようにする)
     for pdf_file in pdf_list:
-        with fitz.open(pdf_file) as doc:
-            merged_pdf.insert_pdf(doc)
+        doc = _open_pdf(pdf_file)
+        merged_pdf.insert_pdf(doc, from_page=0, to_page=-1, annots=annots, widgets=annots, show_progress=0)
+        _close_pdf(doc)
     # ---
-    merged_pdf.save(output_path)
+    merged_pdf.save(output_path, **_SAVE_OPTIONS)
     merged_pdf.close()
-    print('  Saved: {}'.format(output_path))
+    print(f'  Saved: {output_path}')
+
+
+def _default_workers() -> int:
+    """並列処理のデフォルトワーカー数 (CPU数、最大4)"""
+    return min(os.cpu_count() or 1, 4)
+
+
+def _progress(iterable: Iterable, total: int, quiet: bool = False) -> Iterable:
+    """
+    ループに進捗バーを付ける (tqdm がインストールされている場合のみ)
+
+    ページごとに print すると大量の行出力が発生するため、進捗は1本のバーにまとめる
+    quiet の場合や標準エラー出力が端末でない場合は表示しない
+
+    args:
+        iterable: 進捗を表示する対象
+        total (int): 要素数
+        quiet (bool): True の場合は進捗を表示しない
+
+    return:
+        進捗バー付きのイテラブル (tqdm が無い場合は iterable そのもの)
+    """
+    try:
+        from tqdm import tqdm  # 進捗バー表示 (任意)
+    except ImportError:
+        return iterable
+    return tqdm(iterable, total=total, disable=quiet or not sys.stderr.isatty())
+
+
+# 分割処理のワーカーごとに保持する元PDFと出力用PDF (_init_split_worker で設定)
+_worker_src_doc: Document | None = None
+_worker_out_doc: Document | None = None
+
+
+def _init_split_worker(src: str | bytes) -> None:
+    """
+    分割処理のワーカーを初期化する (ProcessPoolExecutor の initializer)
+
+    MuPDF の Document は pickle できずプロセス間で共有できないため、
+    ワーカーにはパス文字列 (またはバイト列) だけを渡し、各ワーカーで元PDFを一度だけ開く
+    出力用PDFも1つだけ作成し、ワーカー内の全タスクで使い回す
+
+    args:
+        src (str or bytes): 元のPDFファイルのパス、またはPDFのバイト列
+    """
+    global _worker_src_doc, _worker_out_doc
+    import fitz  # PyMuPDF
+    _worker_src_doc = _open_pdf(src)
+    _worker_out_doc = fitz.open()
+
 
+def _close_split_worker() -> None:
+    """_init_split_worker で開いたPDFを閉じる"""
+    global _worker_src_doc, _worker_out_doc
+    _worker_out_doc.close()
+    _close_pdf(_worker_src_doc)  # 元ファイルのメモリマップも解放する
+    _worker_src_doc = _worker_out_doc = None
 
-def split_pdf(pdf_path: str | Path, output_dir: str | Path | None = None) -> None:
+
+def _split_chunk(start: int, end: int, out_path: str) -> None:
+    """
+    PDFから指定範囲のページを抽出して保存する (split_pdf, split_pdf_by_pages のワーカー)
+
+    事前に _init_split_worker で元PDFと出力用PDFを用意しておくこと
+    出力用PDFは保存後に全ページを削除して次のタスクで再利用する (タスクごとに fitz.open しない)
+
+    args:
+        start (int): 抽出する先頭ページ番号(0ベース)
+        end (int): 抽出する末尾ページ番号(0ベース、この番号を含む)
+        out_path (str): 出力PDFの保存先パス
+    """
+    new_doc = _worker_out_doc
+    new_doc.insert_pdf(_worker_src_doc, from_page=start, to_page=end)  # ページを抽出して追加
+    # 元PDFから引き継いだ画像・フォントも含めて圧縮して保存
+    # 分割結果は中間ファイルとして再読み込みされることが多いため、重い処理 (clean、pretty) は行わない
+    # 出力用PDFを使い回すと前回までのタスクで削除したページのオブジェクト番号が残るため、
+    # garbage=2 で未使用オブジェクトの除去と xref の詰め直しを行う
+    new_doc.save(out_path, garbage=2, deflate=True, deflate_images=True, deflate_fonts=True, pretty=False)
+    new_doc.delete_pages(range(len(new_doc)))  # 次のタスクのために空にする
+
+
+def split_pdf(
+    pdf_path: str | Path | None = None,
+    output_dir: str | Path | None = None,
+    workers: int | None = None,
+    pdf_bytes: bytes | None = None,
+    quiet: bool = False,
+) -> None:
     """
     PDFを1ページずつ分割し、個別のPDFファイルに保存する
+    pdf_path, pdf_bytesのどちらかは必須
     
     args:
-        pdf_path (str): 分割対象のPDFファイルのパス
+        pdf_path (str, optional): 分割対象のPDFファイルのパス
         output_dir (str, optional): 分割後のPDFファイルの保存先ディレクトリ。Noneの場合は元のPDFと同じディレクトリに保存
+        workers (int, optional): 並列処理のプロセス数。Noneの場合は CPU数 (最大4)
+        pdf_bytes (bytes, optional): 分割対象のPDFのバイト列。この場合 output_dir は必須
+        quiet (bool): True の場合は進捗と結果を表示しない (デフォルト: False)
     
     return:
         None: 分割されたPDFは個別ファイルとして保存される
+    
+    raises:
+        ValueError: pdf_path と pdf_bytes の指定が不正な場合、または pdf_bytes 指定時に output_dir が None の場合
     """
     # 出力先ディレクトリの決定:
     # - output_dir が None の場合は入力ファイルと同じディレクトリ
-    # 出力ファイル名は "{元名}_p{ページ番号}.pdf"
-    fpath = Path(pdf_path)
-    fstem = fpath.stem
+    # 出力ファイル名は "{元名}_p{ページ番号}.pdf" (pdf_bytes の場合は元名を "out" とする)
+    if (pdf_path is None) == (pdf_bytes is None):
+        raise ValueError("pdf_path or pdf_bytes must be specified")
+    if pdf_bytes is not None:
+        if output_dir is None:
+            raise ValueError("output_dir must be specified when pdf_bytes is given")
+        src = pdf_bytes
+        fstem = 'out'
+    else:
+        src = str(pdf_path)
+        fstem = Path(pdf_path).stem
     if output_dir is None:
-        fparent = fpath.parent
+        fparent = Path(pdf_path).parent
     else:
         fparent = Path(output_dir)
         if not fparent.exists():
             fparent.mkdir(parents=True, exist_ok=True)
     # ---
-    doc = fitz.open(pdf_path)
-    npage = len(doc)
-    for page_num in range(npage):
-    # 新しいPDFドキュメントを作成
-        new_doc = fitz.open()
-        
-        # ページを抽出して追加
-        new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-        
-        # ファイル名を指定して保存
-        output_filename = Path(fparent) / f"{fstem}_p{page_num + 1}.pdf"
-        new_doc.save(output_filename)
-        new_doc.close()
-        print(f'  {page_num + 1}/{npage}  Saved: {output_filename}')
-
-    doc.close()
+    with _open_pdf(src) as doc:
+        npage = len(doc)
+    # ページごとの処理は独立しているため、プロセスプールで並列に実行する
+    # (ワーカー数が1またはページ数が1以下の場合はプロセスプールを起動せずに処理する)
+    # 各ワーカーには Document ではなくパス文字列 (またはバイト列) を渡し、ワーカーごとに一度だけ開く (Document は pickle できない)
+    # 出力ファイル名の共通部分は一度だけ組み立てる (ページごとに Path を生成しない)
+    page_nums = list(range(npage))
+    prefix = str(fparent / fstem) + "_p"
+    output_filenames = [f"{prefix}{page_num + 1}.pdf" for page_num in page_nums]
+    if workers is None:
+        workers = _default_workers()
+    if (workers == 1) or (npage <= 1):
+        _init_split_worker(src)
+        results = map(_split_chunk, page_nums, page_nums, output_filenames)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_split_worker, initargs=(src,))
+        results = executor.map(_split_chunk, page_nums, page_nums, output_filenames)
+    try:
+        for _ in _progress(results, total=npage, quiet=quiet):
+            pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        else:
+            _close_split_worker()
+    if not quiet:
+        print(f'  Saved: {npage} files to {fparent}')
 
 
-def split_pdf_by_pages(pdf_path: str | Path, pages_per_doc: int = 10, output_dir: str | Path | None = None) -> None:
+def split_pdf_by_pages(
+    pdf_path: str | Path | None = None,
+    pages_per_doc: int = 10,
+    output_dir: str | Path | None = None,
+    workers: int | None = None,
+    pdf_bytes: bytes | None = None,
+    quiet: bool = False,
+) -> None:
     """
     PDFを指定ページ数ごとに分割し、複数のPDFファイルに保存する
+    pdf_path, pdf_bytesのどちらかは必須
     
     args:
-        pdf_path (str): 分割対象のPDFファイルのパス
+        pdf_path (str, optional): 分割対象のPDFファイルのパス
         pages_per_doc (int): 1つのドキュメントあたりのページ数 (デフォルト: 10)
         output_dir (str, optional): 分割後のPDFファイルの保存先ディレクトリ。Noneの場合は元のPDFと同じディレクトリに保存
+        workers (int, optional): 並列処理のプロセス数。Noneの場合は CPU数 (最大4)
+        pdf_bytes (bytes, optional): 分割対象のPDFのバイト列。この場合 output_dir は必須
+        quiet (bool): True の場合は進捗と結果を表示しない (デフォルト: False)
     
     return:
         None: 分割されたPDFは複数ファイルとして保存される
+    
+    raises:
+        ValueError: pdf_path と pdf_bytes の指定が不正な場合、または pdf_bytes 指定時に output_dir が None の場合
     """
     # 指定した pages_per_doc ごとに区切って PDF を作成する。
     # 出力ファイル名は "{元名}_split{連番}.pdf" とする。
-    fpath = Path(pdf_path)
-    fstem = fpath.stem
+    if (pdf_path is None) == (pdf_bytes is None):
+        raise ValueError("pdf_path or pdf_bytes must be specified")
+    if pdf_bytes is not None:
+        if output_dir is None:
+            raise ValueError("output_dir must be specified when pdf_bytes is given")
+        src = pdf_bytes
+        fstem = 'out'
+    else:
+        src = str(pdf_path)
+        fstem = Path(pdf_path).stem
     if output_dir is None:
-        fparent = fpath.parent
+        fparent = Path(pdf_path).parent
     else:
         fparent = Path(output_dir)
         if not fparent.exists():
             fparent.mkdir(parents=True, exist_ok=True)
     
-    doc = fitz.open(pdf_path)
-    npage = len(doc)
-    doc_num = 1
-    
-    for start_page in range(0, npage, pages_per_doc):
-        end_page = min(start_page + pages_per_doc - 1, npage - 1)
-        
-        # 新しいPDFドキュメントを作成
-        new_doc = fitz.open()
-        
-        # ページを抽出して追加
-        new_doc.insert_pdf(doc, from_page=start_page, to_page=end_page)
-        
-        # ファイル名を指定して保存
-        output_filename = Path(fparent) / f"{fstem}_{doc_num}.pdf"
-        new_doc.save(output_filename)
-        new_doc.close()
-        print(f'  Document {doc_num} (pages {start_page + 1}-{end_page + 1}): Saved: {output_filename}')
-        
-        doc_num += 1
-    
-    doc.close()
+    with _open_pdf(src) as doc:
+        npage = len(doc)
+    # 分割範囲 (先頭ページ, 末尾ページ, 出力ファイル名) を先に決めておく
+    starts = list(range(0, npage, pages_per_doc))
+    ends = [min(start_page + pages_per_doc - 1, npage - 1) for start_page in starts]
+    prefix = str(fparent / fstem) + "_"  # 出力ファイル名の共通部分
+    output_filenames = [f"{prefix}{doc_num}.pdf" for doc_num in range(1, len(starts) + 1)]
+    if workers is None:
+        workers = _default_workers()
+    if (workers == 1) or (pages_per_doc >= npage):
+        # ワーカー数が1、または1ファイルにしかならない場合はプロセスプールを起動せずに処理する
+        _init_split_worker(src)
+        results = map(_split_chunk, starts, ends, output_filenames)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_split_worker, initargs=(src,))
+        results = executor.map(_split_chunk, starts, ends, output_filenames)
+    try:
+        for _ in _progress(results, total=len(starts), quiet=quiet):
+            pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        else:
+            _close_split_worker()
+    if not quiet:
+        print(f'  Saved: {len(starts)} files to {fparent}')
+
+
+# ページ指定 ("3" または "2-4") を1つ分と、その前後の区切り文字 (カンマ・空白) を表す正規表現
+# 指定の直後は区切り文字か文字列の終端でなければならない
+_RANGE_RE = re.compile(r"[,\s]*(\d+)(?:-(\d+))?(?:[,\s]+|\Z)")
 
 
 def _parse_pages_list(s: str):
@@ -241,20 +496,24 @@ def _parse_pages_list(s: str):
       "1,3,5" -> [1,3,5]
       "2-4"   -> [2,3,4]
     戻り値は 1 ベースの整数リスト（del_pdf_pages に渡す前提）。
+    解釈できない文字が含まれる場合 ("1.5", "-3", "2,x,4" など) は ValueError を送出する。
     """
     # 空文字列は None を返す
-    # 文字列中のカンマをスペースに置換して分割、範囲指定を '-' で解釈
+    # 正規表現を前回の一致位置から続けて当てはめ、文字列全体を1回だけ走査する
+    # 途中で一致しなければ不正な指定として扱う (読み飛ばして別のページを削除しないように)
     s = s.strip()
     if not s:
         return None
-    parts = [p.strip() for p in s.replace(',', ' ').split()]
     nums = []
-    for p in parts:
-        if '-' in p:
-            a, b = p.split('-', 1)
-            nums.extend(range(int(a), int(b) + 1))
-        else:
-            nums.append(int(p))
+    pos = 0
+    while pos < len(s):
+        m = _RANGE_RE.match(s, pos)
+        if m is None:
+            raise ValueError(f"invalid page list: {s!r}")
+        a = int(m.group(1))
+        b = int(m.group(2)) if m.group(2) else a
+        nums.extend(range(a, b + 1))
+        pos = m.end()
     return nums
 
 
@@ -271,6 +530,7 @@ if __name__ == "__main__":
     pm = sub.add_parser("merge", help="Merge multiple PDFs")
     pm.add_argument("-i", "--input", required=True, nargs="+", help="PDF files to merge (provide one or more paths)")
     pm.add_argument("-o", "--output", required=False, default="out.pdf", help="output PDF path")
+    pm.add_argument("--no-annots", action="store_true", help="do not copy annotations and form fields")
 
     # delete pages
     pd = sub.add_parser("delpages", help="Delete pages from PDF")
@@ -283,12 +543,16 @@ if __name__ == "__main__":
     ps = sub.add_parser("split", help="Split PDF into single-page PDFs")
     ps.add_argument("-i", "--input", required=True, help="input PDF path")
     ps.add_argument("-o", "--output", required=False, help="output directory (default: same as input)")
+    ps.add_argument("-w", "--workers", type=int, required=False, default=None, help="number of worker processes (default: min(cpu_count, 4))")
+    ps.add_argument("-q", "--quiet", action="store_true", help="do not show progress and results")
 
     # split by pages
     sp = sub.add_parser("split_by_pages", help="Split PDF every N pages")
     sp.add_argument("-i", "--input", required=True, help="input PDF path")
     sp.add_argument("-n", "--npages", type=int, required=False, default=10, help="pages per output PDF")
     sp.add_argument("-o", "--output", required=False, help="output directory (default: same as input)")
+    sp.add_argument("-w", "--workers", type=int, required=False, default=None, help="number of worker processes (default: min(cpu_count, 4))")
+    sp.add_argument("-q", "--quiet", action="store_true", help="do not show progress and results")
 
     args = parser.parse_args()
 
@@ -297,15 +561,15 @@ if __name__ == "__main__":
     if args.cmd == "2in1":
         merge_pdf_2in1(pdf=None, pdf_path=args.input, output_path=Path(args.output))
     elif args.cmd == "merge":
-        merge_pdf(pdf=None, pdf_list=args.input, output_path=Path(args.output))
+        merge_pdf(pdf=None, pdf_list=args.input, output_path=Path(args.output), annots=not args.no_annots)
     elif args.cmd == "delpages":
         del_pages_raw = args.del_pages
         parsed = _parse_pages_list(del_pages_raw)
         del_pdf_pages(pdf=None, pdf_path=args.input, del_pages=(parsed if len(parsed) > 1 else parsed[0]), output_path=Path(args.output))
     elif args.cmd == "split":
-        split_pdf(pdf_path=args.input, output_dir=(args.output if args.output is None else Path(args.output)))
+        split_pdf(pdf_path=args.input, output_dir=(args.output if args.output is None else Path(args.output)), workers=args.workers, quiet=args.quiet)
     elif args.cmd == "split_by_pages":
-        split_pdf_by_pages(pdf_path=args.input, pages_per_doc=args.npages, output_dir=(args.output if args.output is None else Path(args.output)))
+        split_pdf_by_pages(pdf_path=args.input, pages_per_doc=args.npages, output_dir=(args.output if args.output is None else Path(args.output)), workers=args.workers, quiet=args.quiet)
     else:
         parser.print_help()
 